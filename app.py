@@ -3,6 +3,7 @@ import numpy as np
 import pandas as pd
 
 from sklearn.preprocessing import StandardScaler
+from src.logger import configure_logging
 from src.pipeline.predict_pipeline import CustomData,PredictPipeline
 
 application=Flask(__name__)
@@ -42,6 +43,7 @@ def predict_datapoint():
     
 
 if __name__=="__main__":
+    configure_logging()
     app.run(host="0.0.0.0")        
 
 
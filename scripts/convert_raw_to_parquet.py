@@ -0,0 +1,12 @@
+'''
+One-shot conversion of notebook/data/stud.csv into the notebook/data/stud.parquet
+dataset read by DataIngestion. Run from the project root:
+
+    python -m scripts.convert_raw_to_parquet
+'''
+from src.components.data_ingestion import DataIngestion
+from src.logger import configure_logging
+
+if __name__=="__main__":
+    configure_logging()
+    print(DataIngestion().convert_source_to_parquet())
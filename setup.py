@@ -6,15 +6,13 @@ def get_requirements(file_path:str)->List[str]:
     '''
     this function will return the list of requirements
     '''
-    requirements=[]
     with open(file_path) as file_obj:
-        requirements=file_obj.readlines()
-        requirements=[req.replace("\n","") for req in requirements]
+        requirements=file_obj.read().splitlines()
 
-        if HYPEN_E_DOT in requirements:
-            requirements.remove(HYPEN_E_DOT)
-    
-    return requirements
+    return [
+        req for req in requirements
+        if req and req!=HYPEN_E_DOT and not req.startswith("#")
+    ]
 
 setup(
 name='mlproject',
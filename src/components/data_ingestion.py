@@ -1,60 +1,261 @@
 import os
-import sys
+from concurrent.futures import ThreadPoolExecutor
 from src.exception import CustomException
-from src.logger import logging
+from src.logger import configure_logging,logging
+import numpy as np
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+from pyarrow import compute as pc
+from pyarrow import csv as pa_csv
+from pyarrow import dataset as pa_ds
+from pyarrow import parquet as pq
 
 from sklearn.model_selection import train_test_split
-from dataclasses import dataclass
+from dataclasses import dataclass,field
 
 from src.components.data_transformation import DataTransformation
 from src.components.data_transformation import DataTransformationConfig
 
 from src.components.model_trainer import ModelTrainerConfig
 from src.components.model_trainer import ModelTrainer
+
+RAW_DATA_COLUMN_TYPES={
+    "gender":pa.string(),
+    "race_ethnicity":pa.string(),
+    "parental_level_of_education":pa.string(),
+    "lunch":pa.string(),
+    "test_preparation_course":pa.string(),
+    "math_score":pa.int16(),
+    "reading_score":pa.int16(),
+    "writing_score":pa.int16(),
+}
+
+def write_parquet(df,path):
+    pl.from_pandas(df).write_parquet(path,compression="snappy")
+
 @dataclass
 class DataIngestionConfig:
-    train_data_path: str=os.path.join('artifacts',"train.csv")
-    test_data_path: str=os.path.join('artifacts',"test.csv")
-    raw_data_path: str=os.path.join('artifacts',"data.csv")
+    source_data_path: str=os.path.join('notebook','data','stud.csv')
+    source_dataset_path: str=os.path.join('notebook','data','stud.parquet')
+    train_data_path: str=os.path.join('artifacts',"train.parquet")
+    test_data_path: str=os.path.join('artifacts',"test.parquet")
+    raw_data_path: str=os.path.join('artifacts',"data.parquet")
+    block_size: int=8<<20
+    test_size: float=0.2
+    stratify_bins: int=5
+    random_state: int=42
+    # Stream the source block by block instead of loading it whole; set
+    # STREAMING_INGESTION=1 for sources that do not fit in memory
+    streaming: bool=field(default_factory=lambda: os.environ.get("STREAMING_INGESTION")=="1")
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config=DataIngestionConfig()
+        self.executor=ThreadPoolExecutor(max_workers=3)
+        self.write_futures=[]
+
+    def save_artifact(self,df,path):
+        self.write_futures.append(self.executor.submit(write_parquet,df,path))
+
+    def wait_for_artifacts(self):
+        '''
+        Blocks until every artifact submitted by save_artifact is on disk
+        '''
+        try:
+            for future in self.write_futures:
+                future.result()
+            self.write_futures=[]
+        except Exception as e:
+            raise CustomException(e)
+
+    def get_read_options(self):
+        return pa_csv.ReadOptions(block_size=self.ingestion_config.block_size,use_threads=True)
+
+    def get_convert_options(self):
+        return pa_csv.ConvertOptions(
+            column_types=RAW_DATA_COLUMN_TYPES,
+            include_columns=list(RAW_DATA_COLUMN_TYPES),
+        )
+
+    def read_source_csv(self):
+        return pa_csv.read_csv(
+            self.ingestion_config.source_data_path,
+            read_options=self.get_read_options(),
+            convert_options=self.get_convert_options(),
+        )
+
+    def convert_source_to_parquet(self):
+        '''
+        One-shot conversion of the raw csv into a parquet dataset so later
+        runs skip csv parsing and read only the projected columns
+        '''
+        try:
+            table=self.read_source_csv()
+            pq.write_to_dataset(
+                table,
+                self.ingestion_config.source_dataset_path,
+                existing_data_behavior="delete_matching",
+            )
+            logging.info("Converted %s to %s",self.ingestion_config.source_data_path,self.ingestion_config.source_dataset_path)
+            return self.ingestion_config.source_dataset_path
+        except Exception as e:
+            raise CustomException(e)
+
+    def use_source_dataset(self):
+        '''
+        True when the converted parquet dataset exists and is not older than
+        the raw csv; a stale dataset is ignored with a warning
+        '''
+        dataset_path=self.ingestion_config.source_dataset_path
+        if not os.path.exists(dataset_path):
+            return False
+        if not os.path.exists(self.ingestion_config.source_data_path):
+            return True
+
+        dataset_mtime=max(
+            (os.path.getmtime(os.path.join(root,name)) for root,_,names in os.walk(dataset_path) for name in names),
+            default=0,
+        )
+        if dataset_mtime<os.path.getmtime(self.ingestion_config.source_data_path):
+            logging.warning(
+                "%s is older than %s, reading the csv instead; re-run scripts.convert_raw_to_parquet",
+                dataset_path,self.ingestion_config.source_data_path
+            )
+            return False
+        return True
+
+    def read_source_table(self):
+        if self.use_source_dataset():
+            dataset=pa_ds.dataset(self.ingestion_config.source_dataset_path,format="parquet")
+            return dataset.to_table(columns=list(RAW_DATA_COLUMN_TYPES))
+        return self.read_source_csv()
+
+    def open_source_batches(self):
+        '''
+        Returns (schema, record batch iterator) over the raw data
+        '''
+        if self.use_source_dataset():
+            dataset=pa_ds.dataset(self.ingestion_config.source_dataset_path,format="parquet")
+            columns=list(RAW_DATA_COLUMN_TYPES)
+            schema=pa.schema([dataset.schema.field(c) for c in columns])
+            return schema,dataset.to_batches(columns=columns)
+        reader=pa_csv.open_csv(
+            self.ingestion_config.source_data_path,
+            read_options=self.get_read_options(),
+            convert_options=self.get_convert_options(),
+        )
+        return reader.schema,reader
 
     def initiate_data_ingestion(self):
+        '''
+        Returns the artifact paths and the in-memory train/test dataframes.
+        The parquet artifacts are written in the background: callers must
+        call wait_for_artifacts() before relying on them (it also surfaces
+        any write error) and shut down self.executor when done
+        '''
         logging.info("Entered the data ingestion method or component")
         try:
-            df=pd.read_csv('notebook\data\stud.csv')
+            df=self.read_source_table().to_pandas(self_destruct=True,types_mapper=pd.ArrowDtype)
             logging.info('Read the dataset as dataframe')
 
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
 
-            df.to_csv(self.ingestion_config.raw_data_path,index=False,header=True)
+            self.save_artifact(df,self.ingestion_config.raw_data_path)
 
             logging.info("Train test split initiated")
-            train_set,test_set=train_test_split(df,test_size=0.2,random_state=42)
+            strat=pd.qcut(
+                df["math_score"].to_numpy(),
+                q=self.ingestion_config.stratify_bins,
+                labels=False,
+                duplicates="drop"
+            )
+            train_set,test_set=train_test_split(
+                df,
+                test_size=self.ingestion_config.test_size,
+                random_state=self.ingestion_config.random_state,
+                stratify=strat
+            )
 
-            train_set.to_csv(self.ingestion_config.train_data_path,index=False,header=True)
+            self.save_artifact(train_set,self.ingestion_config.train_data_path)
 
-            test_set.to_csv(self.ingestion_config.test_data_path,index=False,header=True)
+            self.save_artifact(test_set,self.ingestion_config.test_data_path)
 
             logging.info("Inmgestion of the data iss completed")
 
+            return(
+                self.ingestion_config.train_data_path,
+                self.ingestion_config.test_data_path,
+                train_set,
+                test_set
+
+            )
+        except Exception as e:
+            raise CustomException(e)
+
+    def initiate_streaming_data_ingestion(self):
+        '''
+        Streams the raw csv block by block into the train/test parquet
+        artifacts so peak memory is bounded by block_size, not file size.
+        Returns the artifact paths for initiate_data_transformation.
+
+        Each row goes to test with probability test_size, so the split is
+        neither exactly test_size nor stratified on math_score like
+        initiate_data_ingestion; quantile bins would need a full pass first
+        '''
+        logging.info("Entered the streaming data ingestion method or component")
+        paths=[
+            self.ingestion_config.raw_data_path,
+            self.ingestion_config.train_data_path,
+            self.ingestion_config.test_data_path,
+        ]
+        tmp_paths=[path+".tmp" for path in paths]
+        try:
+            os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
+
+            schema,batches=self.open_source_batches()
+            rng=np.random.default_rng(self.ingestion_config.random_state)
+
+            raw_tmp,train_tmp,test_tmp=tmp_paths
+            with pq.ParquetWriter(raw_tmp,schema,compression="snappy") as raw_writer, \
+                    pq.ParquetWriter(train_tmp,schema,compression="snappy") as train_writer, \
+                    pq.ParquetWriter(test_tmp,schema,compression="snappy") as test_writer:
+                for batch in batches:
+                    mask=pa.array(rng.random(batch.num_rows)<self.ingestion_config.test_size)
+                    raw_writer.write_batch(batch)
+                    train_writer.write_batch(batch.filter(pc.invert(mask)))
+                    test_writer.write_batch(batch.filter(mask))
+
+            for tmp_path,path in zip(tmp_paths,paths):
+                os.replace(tmp_path,path)
+
+            logging.info("Streaming ingestion of the data is completed")
+
             return(
                 self.ingestion_config.train_data_path,
                 self.ingestion_config.test_data_path
 
             )
         except Exception as e:
-            raise CustomException(e,sys)
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise CustomException(e)
         
 if __name__=="__main__":
+    configure_logging()
     obj=DataIngestion()
-    train_data,test_data=obj.initiate_data_ingestion()
-
-    data_transformation=DataTransformation()
-    train_arr,test_arr,_=data_transformation.initiate_data_transformation(train_data,test_data)
+    try:
+        data_transformation=DataTransformation()
+        if obj.ingestion_config.streaming:
+            train_data,test_data=obj.initiate_streaming_data_ingestion()
+            train_arr,test_arr,_=data_transformation.initiate_data_transformation(train_data,test_data)
+        else:
+            train_data,test_data,train_set,test_set=obj.initiate_data_ingestion()
+            train_arr,test_arr,_=data_transformation.initiate_data_transformation(train_df=train_set,test_df=test_set)
+            obj.wait_for_artifacts()
+    finally:
+        obj.executor.shutdown()
 
     modeltrainer=ModelTrainer()
     print(modeltrainer.initiate_model_trainer(train_arr,test_arr))
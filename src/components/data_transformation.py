@@ -1,12 +1,15 @@
+import hashlib
+import inspect
+import pickle
 import sys
 from dataclasses import dataclass
 
+import joblib
 import numpy as np 
 import pandas as pd
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder,StandardScaler
+import sklearn
+from joblib import Memory
+from sklearn.base import BaseEstimator,TransformerMixin
 
 from src.exception import CustomException
 from src.logger import logging
@@ -16,11 +19,137 @@ from src.utils import save_object
 
 @dataclass
 class DataTransformationConfig:
-    preprocessor_obj_file_path=os.path.join('artifacts',"proprocessor.pkl")
+    preprocessor_obj_file_path=os.path.join('artifacts',"preprocessor.pkl")
+    cache_dir=os.path.join('artifacts',"cache")
+    cache_items_limit=4
+
+# Bump to invalidate artifacts/cache when cached outputs change meaning
+CACHE_VERSION=1
+
+class StudentFeatureTransformer(BaseEstimator,TransformerMixin):
+    '''
+    Median-impute and standardize the numerical columns, mode-impute and
+    one-hot encode the categorical columns, all as float32 numpy ops.
+    One-hot rows are gathered from a per-column lookup table indexed by
+    the categorical codes; the table's last row is all zeros so unknown
+    categories (code -1) encode as zeros
+    '''
+    def __init__(self,numerical_columns,categorical_columns):
+        self.numerical_columns=numerical_columns
+        self.categorical_columns=categorical_columns
+
+    def _numerical_array(self,X):
+        num=X[self.numerical_columns].to_numpy(dtype=np.float32,na_value=np.nan)
+        return np.where(np.isnan(num),self.medians_,num)
+
+    def _encode_categorical(self,X,out):
+        offset=0
+        for c in self.categorical_columns:
+            lut=self.luts_[c]
+            k=lut.shape[1]
+            col=X[c].astype("category")
+            # Values outside the fitted categories get code -1 (the zero row)
+            codes=col.cat.set_categories(self.categories_[c]).cat.codes.to_numpy(copy=True)
+            codes[col.isna().to_numpy()]=self.categories_[c].index(self.modes_[c])
+            np.take(lut,codes,axis=0,out=out[:,offset:offset+k])
+            offset+=k
+
+    def fit(self,X,y=None):
+        num=X[self.numerical_columns].to_numpy(dtype=np.float32,na_value=np.nan)
+        self.medians_=np.nanmedian(num,axis=0)
+        num=np.where(np.isnan(num),self.medians_,num)
+        self.means_=num.mean(axis=0)
+        self.scales_=num.std(axis=0)
+        self.scales_[self.scales_==0]=1
+
+        cat=X[self.categorical_columns].astype(object)
+        self.modes_={c:cat[c].mode(dropna=True).iloc[0] for c in self.categorical_columns}
+        self.categories_={
+            c:sorted(cat[c].fillna(self.modes_[c]).unique()) for c in self.categorical_columns
+        }
+        self.luts_={
+            c:np.vstack([
+                np.eye(len(self.categories_[c]),dtype=np.float32),
+                np.zeros((1,len(self.categories_[c])),dtype=np.float32)
+            ])
+            for c in self.categorical_columns
+        }
+        self.n_dummies_=sum(len(self.categories_[c]) for c in self.categorical_columns)
+        return self
+
+    def transform(self,X):
+        num=self._numerical_array(X)
+        d=num.shape[1]
+
+        out=np.empty((len(X),d+self.n_dummies_),dtype=np.float32)
+        np.subtract(num,self.means_,out=out[:,:d])
+        out[:,:d]/=self.scales_
+        self._encode_categorical(X,out[:,d:])
+        return out
+
+def append_target_column(input_feature_arr,target_feature_df):
+    '''
+    Returns [features | target] in a single allocation of the feature dtype
+    '''
+    n,d=input_feature_arr.shape
+    arr=np.empty((n,d+1),dtype=input_feature_arr.dtype)
+    arr[:,:d]=input_feature_arr
+    arr[:,d]=target_feature_df.to_numpy(copy=False)
+    return arr
+
+def fit_transform_features(cache_key,preprocessing_obj,train_df,test_df,target_column_name):
+    '''
+    Fits the preprocessor on train_df and returns it pickled, with the
+    transformed train and test arrays. Results are cached on cache_key only.
+    The estimator travels as bytes so the cache's mmap_mode applies to the
+    arrays only: memmapped fitted attributes would be read-only and would
+    pickle in-band, defeating save_object's out-of-band buffers
+    '''
+    input_feature_train_df=train_df.drop(columns=[target_column_name])
+    target_feature_train_df=train_df[target_column_name]
+
+    input_feature_test_df=test_df.drop(columns=[target_column_name])
+    target_feature_test_df=test_df[target_column_name]
+
+    input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df).astype(np.float32,copy=False)
+    input_feature_test_arr=preprocessing_obj.transform(input_feature_test_df).astype(np.float32,copy=False)
+
+    train_arr=append_target_column(input_feature_train_arr,target_feature_train_df)
+    test_arr=append_target_column(input_feature_test_arr,target_feature_test_df)
+
+    return pickle.dumps(preprocessing_obj,protocol=pickle.HIGHEST_PROTOCOL),train_arr,test_arr
 
 class DataTransformation:
     def __init__(self):
         self.data_transformation_config=DataTransformationConfig()
+        self.memory=Memory(self.data_transformation_config.cache_dir,mmap_mode="r",verbose=0)
+        self.cached_fit_transform_features=self.memory.cache(
+            fit_transform_features,
+            ignore=["preprocessing_obj","train_df","test_df","target_column_name"]
+        )
+
+    def get_cache_key(self,train_df,test_df,preprocessing_obj):
+        '''
+        Content-addressed key over the train/test data, the pipeline
+        definition, this module's source and the library versions the cached
+        estimator was pickled with. Returns None when the source is not
+        available (e.g. a .pyc-only deploy) so the caller skips the cache
+        '''
+        try:
+            module_source=inspect.getsource(sys.modules[__name__])
+        except (OSError,TypeError):
+            return None
+
+        digest=hashlib.blake2b()
+        digest.update(str(CACHE_VERSION).encode())
+        digest.update(module_source.encode())
+        for module in (np,pd,sklearn,joblib):
+            digest.update(f"{module.__name__}={module.__version__}".encode())
+        for df in (train_df,test_df):
+            digest.update(repr(list(df.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(df,index=False).to_numpy().tobytes())
+        digest.update(repr(preprocessing_obj).encode())
+        return digest.hexdigest()
 
     def get_data_transformer_object(self):
         '''
@@ -37,76 +166,82 @@ class DataTransformation:
                 "test_preparation_course",
             ]
 
-            num_pipeline= Pipeline(
-                steps=[
-                ("imputer",SimpleImputer(strategy="median")),
-                ("scaler",StandardScaler())
-
-                ]
-            )
-
-            cat_pipeline=Pipeline(
-
-                steps=[
-                ("imputer",SimpleImputer(strategy="most_frequent")),
-                ("one_hot_encoder",OneHotEncoder()),
-                ("scaler",StandardScaler(with_mean=False))
-                ]
-
-            )
-
-            logging.info(f"Categorical columns: {categorical_columns}")
-            logging.info(f"Numerical columns: {numerical_columns}")
-
-            preprocessor=ColumnTransformer(
-                [
-                ("num_pipeline",num_pipeline,numerical_columns),
-                ("cat_pipelines",cat_pipeline,categorical_columns)
-
-                ]
-
+            logging.info("Categorical columns: %s",categorical_columns)
+            logging.info("Numerical columns: %s",numerical_columns)
 
+            preprocessor=StudentFeatureTransformer(
+                numerical_columns=numerical_columns,
+                categorical_columns=categorical_columns
             )
 
             return preprocessor
         
         except Exception as e:
-            raise CustomException(e,sys)
+            raise CustomException(e)
         
-    def initiate_data_transformation(self,train_path,test_path):
+    def initiate_data_transformation(self,train_path=None,test_path=None,train_df=None,test_df=None):
+        '''
+        Accepts either artifact paths or the in-memory train/test dataframes.
+        The returned train/test arrays are read-only (memory-mapped from
+        artifacts/cache when caching is available); copy them before writing
+        '''
 
         try:
-            train_df=pd.read_csv(train_path)
-            test_df=pd.read_csv(test_path)
+            target_column_name="math_score"
+            numerical_columns = ["writing_score", "reading_score"]
+            categorical_columns = [
+                "gender",
+                "race_ethnicity",
+                "parental_level_of_education",
+                "lunch",
+                "test_preparation_course",
+            ]
+            columns=numerical_columns+categorical_columns+[target_column_name]
+            # float32 keeps missing scores as NaN for the median imputation
+            dtypes={
+                "writing_score":"float32",
+                "reading_score":"float32",
+                "gender":"category",
+                "race_ethnicity":"category",
+                "parental_level_of_education":"category",
+                "lunch":"category",
+                "test_preparation_course":"category",
+            }
+
+            if train_df is None:
+                train_df=pd.read_parquet(train_path,columns=columns)
+            train_df=train_df[columns].astype(dtypes)
+            if test_df is None:
+                test_df=pd.read_parquet(test_path,columns=columns)
+            test_df=test_df[columns].astype(dtypes)
 
             logging.info("Read train and test data completed")
 
             logging.info("Obtaining preprocessing object")
 
             preprocessing_obj=self.get_data_transformer_object()
-
-            target_column_name="math_score"
-            numerical_columns = ["writing_score", "reading_score"]
-
-            input_feature_train_df=train_df.drop(columns=[target_column_name],axis=1)
-            target_feature_train_df=train_df[target_column_name]
-
-            input_feature_test_df=test_df.drop(columns=[target_column_name],axis=1)
-            target_feature_test_df=test_df[target_column_name]
+            cache_key=self.get_cache_key(train_df,test_df,preprocessing_obj)
 
             logging.info(
-                f"Applying preprocessing object on training dataframe and testing dataframe."
+                "Applying preprocessing object on training dataframe and testing dataframe."
             )
 
-            input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_arr=preprocessing_obj.transform(input_feature_test_df)
-
-            train_arr = np.c_[
-                input_feature_train_arr, np.array(target_feature_train_df)
-            ]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
-
-            logging.info(f"Saved preprocessing object.")
+            if cache_key is None:
+                logging.warning("Module source unavailable, skipping preprocessing cache")
+                preprocessing_bytes,train_arr,test_arr=fit_transform_features(
+                    cache_key,preprocessing_obj,train_df,test_df,target_column_name
+                )
+                # Match the read-only memmaps returned by the cached path
+                train_arr.setflags(write=False)
+                test_arr.setflags(write=False)
+            else:
+                preprocessing_bytes,train_arr,test_arr=self.cached_fit_transform_features(
+                    cache_key,preprocessing_obj,train_df,test_df,target_column_name
+                )
+                self.memory.reduce_size(items_limit=self.data_transformation_config.cache_items_limit)
+            preprocessing_obj=pickle.loads(preprocessing_bytes)
+
+            logging.info("Saved preprocessing object.")
 
             save_object(
 
@@ -121,4 +256,4 @@ class DataTransformation:
                 self.data_transformation_config.preprocessor_obj_file_path,
             )
         except Exception as e:
-            raise CustomException(e,sys)
+            raise CustomException(e)
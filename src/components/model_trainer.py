@@ -1,5 +1,4 @@
 import os
-import sys
 from dataclasses import dataclass
 
 from catboost import CatBoostRegressor
@@ -99,7 +98,7 @@ class ModelTrainer:
 
             if best_model_score<0.6:
                 raise CustomException("No best model found")
-            logging.info(f"Best found model on both training and testing dataset")
+            logging.info("Best found model on both training and testing dataset: %s",best_model_name)
 
             save_object(
                 file_path=self.model_trainer_config.trained_model_file_path,
@@ -116,4 +115,4 @@ class ModelTrainer:
 
             
         except Exception as e:
-            raise CustomException(e,sys)
\ No newline at end of file
+            raise CustomException(e)
\ No newline at end of file
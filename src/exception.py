@@ -1,24 +1,34 @@
-import sys
+import traceback
 from src.logger import logging
 
-def error_message_detail(error,error_detail:sys):
-    _,_,exc_tb=error_detail.exc_info()
-    file_name=exc_tb.tb_frame.f_code.co_filename
+def error_message_detail(error:BaseException):
+    stack=traceback.TracebackException.from_exception(error).stack
+    if stack:
+        innermost=stack[-1]
+        file_name,line_number=innermost.filename,innermost.lineno
+    else:
+        file_name,line_number=None,None
     error_message="Error occured in python script name [{0}] line number [{1}] error message[{2}]".format(
-     file_name,exc_tb.tb_lineno,str(error))
+     file_name,line_number,str(error))
 
     return error_message
 
     
 
 class CustomException(Exception):
-    def __init__(self,error_message,error_detail:sys):
-        super().__init__(error_message)
-        self.error_message=error_message_detail(error_message,error_detail=error_detail)
+    def __init__(self,error):
+        super().__init__(error)
+        self.error=error
+        self._error_message=None
     
     def __str__(self):
-        return self.error_message
+        if self._error_message is None:
+            if isinstance(self.error,BaseException):
+                self._error_message=error_message_detail(self.error)
+            else:
+                self._error_message=str(self.error)
+        return self._error_message
     
 
 
-        
\ No newline at end of file
+        
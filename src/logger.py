@@ -2,16 +2,27 @@ import logging
 import os
 from datetime import datetime
 
-LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
-os.makedirs(logs_path,exist_ok=True)
+_configured=False
 
-LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
+def configure_logging():
+    '''
+    Sets up the timestamped log file once per process; call from entry points
+    '''
+    global _configured
+    if _configured:
+        return
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
+    LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+    logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
+    os.makedirs(logs_path,exist_ok=True)
 
+    LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
 
-)
+    logging.basicConfig(
+        filename=LOG_FILE_PATH,
+        format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+
+
+    )
+    _configured=True
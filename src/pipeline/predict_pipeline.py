@@ -1,4 +1,4 @@
-import sys
+import os
 import pandas as pd
 from src.exception import CustomException
 from src.utils import load_object
@@ -21,7 +21,7 @@ class PredictPipeline:
             return preds
         
         except Exception as e:
-            raise CustomException(e,sys)
+            raise CustomException(e)
 
 
 
@@ -64,5 +64,5 @@ class CustomData:
             return pd.DataFrame(custom_data_input_dict)
 
         except Exception as e:
-            raise CustomException(e, sys)
+            raise CustomException(e)
 
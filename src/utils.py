@@ -1,26 +1,60 @@
 import os
-import sys
 
 import numpy as np 
 import pandas as pd
-import dill
 import pickle
 from sklearn.metrics import r2_score
 from sklearn.model_selection import GridSearchCV
 
 from src.exception import CustomException
 
+# Prefix marking a pickle whose out-of-band buffers are stored, aligned, in
+# the same file after the payload. Plain pickles start with the PROTO opcode
+# b"\x80", so the two never collide.
+OUT_OF_BAND_MAGIC = b"PKB1"
+BUFFER_ALIGNMENT = 64
+FOOTER_SIZE = 8
+
 def save_object(file_path, obj):
     try:
         dir_path = os.path.dirname(file_path)
 
-        os.makedirs(dir_path, exist_ok=True)
-
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        buffers = []
+
+        def buffer_callback(buffer):
+            # Returning True keeps empty buffers in-band; append() returns None
+            return buffer.raw().nbytes == 0 or buffers.append(buffer)
+
+        payload = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+
+        # Layout: magic | payload | aligned buffers | offsets pickle | footer,
+        # where the footer is the offsets pickle's position. Everything lives
+        # in one file so the os.replace below swaps payload and buffers together
+        tmp_path = file_path + ".tmp"
+        try:
+            with open(tmp_path, "wb", buffering=1 << 20) as file_obj:
+                file_obj.write(OUT_OF_BAND_MAGIC)
+                file_obj.write(payload)
+                offsets = []
+                for buffer in buffers:
+                    file_obj.write(b"\0" * (-file_obj.tell() % BUFFER_ALIGNMENT))
+                    raw = buffer.raw()
+                    offsets.append((file_obj.tell(), raw.nbytes))
+                    file_obj.write(raw)
+                header_offset = file_obj.tell()
+                pickle.dump(offsets, file_obj, protocol=5)
+                file_obj.write(header_offset.to_bytes(FOOTER_SIZE, "little"))
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     except Exception as e:
-        raise CustomException(e, sys)
+        raise CustomException(e)
     
 def evaluate_models(X_train, y_train,X_test,y_test,models,param):
     try:
@@ -51,12 +85,28 @@ def evaluate_models(X_train, y_train,X_test,y_test,models,param):
         return report
 
     except Exception as e:
-        raise CustomException(e, sys)
+        raise CustomException(e)
     
 def load_object(file_path):
     try:
         with open(file_path, "rb") as file_obj:
-            return pickle.load(file_obj)
+            if file_obj.read(len(OUT_OF_BAND_MAGIC)) != OUT_OF_BAND_MAGIC:
+                file_obj.seek(0)
+                return pickle.load(file_obj)
+
+            file_obj.seek(-FOOTER_SIZE, os.SEEK_END)
+            file_obj.seek(int.from_bytes(file_obj.read(FOOTER_SIZE), "little"))
+            offsets = pickle.load(file_obj)
+
+            buffers = []
+            if offsets:
+                # Copy-on-write mapping: arrays stay writable like a plain
+                # unpickle, but untouched pages are shared with the page cache
+                mm = np.memmap(file_path, dtype=np.uint8, mode="c")
+                buffers = [memoryview(mm[start:start + nbytes]) for start, nbytes in offsets]
+
+            file_obj.seek(len(OUT_OF_BAND_MAGIC))
+            return pickle.load(file_obj, buffers=buffers)
 
     except Exception as e:
-        raise CustomException(e, sys)
+        raise CustomException(e)
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder,StandardScaler
+
+from src.components.data_transformation import StudentFeatureTransformer
+
+NUMERICAL_COLUMNS=["writing_score","reading_score"]
+CATEGORICAL_COLUMNS=[
+    "gender",
+    "race_ethnicity",
+    "parental_level_of_education",
+    "lunch",
+    "test_preparation_course",
+]
+
+def load_split():
+    df=pd.read_csv(os.path.join("notebook","data","stud.csv"))
+    df=df[NUMERICAL_COLUMNS+CATEGORICAL_COLUMNS].astype({c:"float64" for c in NUMERICAL_COLUMNS})
+    train_df,test_df=df.iloc[:800].copy(),df.iloc[800:].copy()
+    train_df.iloc[[0,5],train_df.columns.get_loc("reading_score")]=np.nan
+    train_df.iloc[[1,7],train_df.columns.get_loc("lunch")]=np.nan
+    test_df.iloc[0,test_df.columns.get_loc("writing_score")]=np.nan
+    test_df.iloc[1,test_df.columns.get_loc("race_ethnicity")]=np.nan
+    test_df.iloc[2,test_df.columns.get_loc("gender")]="unknown"
+    return train_df,test_df
+
+def column_transformer(scale_dummies):
+    cat_steps=[
+        ("imputer",SimpleImputer(strategy="most_frequent")),
+        ("one_hot_encoder",OneHotEncoder(sparse_output=False,handle_unknown="ignore")),
+    ]
+    if scale_dummies:
+        cat_steps.append(("scaler",StandardScaler(with_mean=False)))
+    return ColumnTransformer(
+        [
+        ("num_pipeline",Pipeline(steps=[
+            ("imputer",SimpleImputer(strategy="median")),
+            ("scaler",StandardScaler())
+        ]),NUMERICAL_COLUMNS),
+        ("cat_pipelines",Pipeline(steps=cat_steps),CATEGORICAL_COLUMNS)
+        ]
+    )
+
+def fit_both(scale_dummies):
+    train_df,test_df=load_split()
+    transformer=StudentFeatureTransformer(NUMERICAL_COLUMNS,CATEGORICAL_COLUMNS)
+    reference=column_transformer(scale_dummies)
+    ours=(transformer.fit_transform(train_df),transformer.transform(test_df))
+    theirs=(reference.fit_transform(train_df.astype({c:object for c in CATEGORICAL_COLUMNS})),
+            reference.transform(test_df.astype({c:object for c in CATEGORICAL_COLUMNS})))
+    return ours,theirs
+
+def test_matches_column_transformer():
+    (train_arr,test_arr),(expected_train,expected_test)=fit_both(scale_dummies=False)
+
+    assert train_arr.dtype==np.float32
+    np.testing.assert_allclose(train_arr,expected_train,rtol=1e-5,atol=1e-5)
+    np.testing.assert_allclose(test_arr,expected_test,rtol=1e-5,atol=1e-5)
+
+def test_matches_baseline_pipeline_up_to_dummy_scaling():
+    # The original pipeline also divided the dummies by their training std
+    (train_arr,test_arr),(expected_train,expected_test)=fit_both(scale_dummies=True)
+    d=len(NUMERICAL_COLUMNS)
+    dummy_std=train_arr[:,d:].std(axis=0)
+    dummy_std[dummy_std==0]=1
+
+    for arr in (train_arr,test_arr):
+        arr[:,d:]/=dummy_std
+    np.testing.assert_allclose(train_arr,expected_train,rtol=1e-4,atol=1e-4)
+    np.testing.assert_allclose(test_arr,expected_test,rtol=1e-4,atol=1e-4)
+
+def test_unknown_category_encodes_as_zeros():
+    train_df,test_df=load_split()
+    transformer=StudentFeatureTransformer(NUMERICAL_COLUMNS,CATEGORICAL_COLUMNS).fit(train_df)
+    gender_width=len(transformer.categories_["gender"])
+    d=len(NUMERICAL_COLUMNS)
+
+    row=transformer.transform(test_df.iloc[[2]])
+    assert not row[0,d:d+gender_width].any()
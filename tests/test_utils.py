@@ -0,0 +1,72 @@
+import os
+import pickle
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from src.exception import CustomException
+from src.utils import FOOTER_SIZE,OUT_OF_BAND_MAGIC,load_object,save_object
+
+def read_offsets(file_path):
+    with open(file_path,"rb") as file_obj:
+        assert file_obj.read(len(OUT_OF_BAND_MAGIC))==OUT_OF_BAND_MAGIC
+        file_obj.seek(-FOOTER_SIZE,os.SEEK_END)
+        file_obj.seek(int.from_bytes(file_obj.read(FOOTER_SIZE),"little"))
+        return pickle.load(file_obj)
+
+def test_round_trip_with_out_of_band_buffers(tmp_path):
+    file_path=str(tmp_path/"obj.pkl")
+    obj={"a":np.arange(10,dtype=np.float32),"b":np.ones((3,4)),"name":"x"}
+
+    save_object(file_path,obj)
+    offsets=read_offsets(file_path)
+    loaded=load_object(file_path)
+
+    assert len(offsets)==2
+    assert all(start%64==0 for start,_ in offsets)
+    np.testing.assert_array_equal(loaded["a"],obj["a"])
+    np.testing.assert_array_equal(loaded["b"],obj["b"])
+    assert loaded["name"]=="x"
+
+    # Copy-on-write mapping: writable, and writes never reach the file
+    assert loaded["a"].flags.writeable
+    loaded["a"][0]=99
+    np.testing.assert_array_equal(load_object(file_path)["a"],obj["a"])
+
+def test_zero_length_array_stays_in_band(tmp_path):
+    file_path=str(tmp_path/"empty.pkl")
+    save_object(file_path,np.array([],dtype=np.float64))
+
+    assert read_offsets(file_path)==[]
+    loaded=load_object(file_path)
+    assert loaded.shape==(0,) and loaded.dtype==np.float64
+
+def test_non_contiguous_array(tmp_path):
+    file_path=str(tmp_path/"strided.pkl")
+    arr=np.arange(20.0).reshape(4,5)[:,::2]
+    assert not arr.flags.c_contiguous and not arr.flags.f_contiguous
+
+    save_object(file_path,arr)
+    np.testing.assert_array_equal(load_object(file_path),arr)
+
+def test_loads_legacy_plain_pickle(tmp_path):
+    file_path=str(tmp_path/"legacy.pkl")
+    obj={"coef":np.arange(3.0),"n":3}
+    with open(file_path,"wb") as file_obj:
+        pickle.dump(obj,file_obj)
+
+    loaded=load_object(file_path)
+    np.testing.assert_array_equal(loaded["coef"],obj["coef"])
+    assert loaded["n"]==3
+
+def test_failed_save_keeps_previous_file(tmp_path):
+    file_path=str(tmp_path/"model.pkl")
+    save_object(file_path,np.arange(4))
+
+    with mock.patch("src.utils.os.replace",side_effect=OSError("disk full")):
+        with pytest.raises(CustomException):
+            save_object(file_path,np.arange(100,104))
+
+    np.testing.assert_array_equal(load_object(file_path),np.arange(4))
+    assert os.listdir(tmp_path)==["model.pkl"]